@@ -17,10 +17,12 @@
 
 """aioAseko."""
 
+from .alert import *  # noqa: F401, F403
 from .aseko import *  # noqa: F401, F403
 from .consumable import *  # noqa: F401, F403
 from .exceptions import *  # noqa: F401, F403
 from .filtration import *  # noqa: F401, F403
 from .status_value import *  # noqa: F401, F403
+from .sync import *  # noqa: F401, F403
 from .unit import *  # noqa: F401, F403
 from .user import *  # noqa: F401, F403
@@ -0,0 +1,263 @@
+# Copyright 2021, 2022, 2024 Milan Meulemans.
+#
+# This file is part of aioaseko.
+#
+# aioaseko is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# aioaseko is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with aioaseko.  If not, see <https://www.gnu.org/licenses/>.
+
+"""aioAseko alert rules."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+import time
+
+from .consumable import ConsumableType, ElectrolyzerConsumable, LiquidConsumable
+from .status_value import StatusValueType, StringValue
+from .unit import Unit, UnitNeverConnected
+
+AlertSource = StatusValueType | ConsumableType | str
+AlertValue = float | bool | str | None
+
+_UNIT_ATTRIBUTES = {
+    *(field.name for cls in (Unit, UnitNeverConnected) for field in fields(cls)),
+    *(name for name, value in vars(Unit).items() if isinstance(value, property)),
+} - {"brand_name", "consumables", "status_values"}
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Alert rule.
+
+    The source is a status value type, a consumable type or the name of a
+    unit attribute like "online" or "has_warning". A consumable has a value
+    of True when any of its parts has a warning.
+
+    The rule is active when the value equals `equals`, or when `equals` is
+    None, when the value is below `low` or above `high`. An active threshold
+    rule only clears when the value is `hysteresis` inside the thresholds.
+    A state change is only emitted after it has held for `debounce` seconds.
+    An unknown value, like a missing reading, does not match the rule, so an
+    active rule clears when its value becomes unknown.
+    """
+
+    rule_id: str
+    source: AlertSource
+    low: float | None = None
+    high: float | None = None
+    equals: AlertValue = None
+    hysteresis: float = 0.0
+    debounce: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Validate the rule."""
+        if self.equals is not None:
+            if self.low is not None or self.high is not None:
+                raise ValueError("A rule can not have both equals and thresholds.")
+        elif self.low is None and self.high is None:
+            raise ValueError("A rule needs equals, low or high.")
+        if self.low is not None and self.high is not None and self.low > self.high:
+            raise ValueError("Low can not be above high.")
+        if self.hysteresis < 0:
+            raise ValueError("Hysteresis can not be negative.")
+        if self.debounce < 0:
+            raise ValueError("Debounce can not be negative.")
+
+    def is_active(self, value: AlertValue, active: bool) -> bool:
+        """Return if the rule is active for the value, given the current state."""
+        if self.equals is not None:
+            return value == self.equals
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return False
+        margin = self.hysteresis if active else 0.0
+        if self.low is not None and value < self.low + margin:
+            return True
+        if self.high is not None and value > self.high - margin:
+            return True
+        return False
+
+
+@dataclass(frozen=True)
+class AlertTransition:
+    """Alert state transition of a rule for a unit."""
+
+    rule: AlertRule
+    serial_number: str
+    active: bool
+    value: AlertValue
+    timestamp: float
+
+
+class _AlertState:
+    """Alert state of a rule for a unit."""
+
+    __slots__ = ("active", "pending_since")
+
+    def __init__(self) -> None:
+        """Initialize the alert state."""
+        self.active = False
+        self.pending_since: float | None = None
+
+
+class AlertEngine:
+    """Incremental alert rule engine over unit readings."""
+
+    def __init__(self, rules: Iterable[AlertRule] = ()) -> None:
+        """Initialize the alert engine."""
+        self._rules: dict[AlertSource, list[AlertRule]] = {}
+        self._values: dict[str, dict[AlertSource, AlertValue]] = {}
+        self._states: dict[tuple[str, str], _AlertState] = {}
+        self._pending: dict[tuple[str, str], tuple[AlertRule, AlertValue]] = {}
+        self._rule_ids: set[str] = set()
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: AlertRule) -> None:
+        """Add a rule, it is evaluated for all units on the next update."""
+        if rule.rule_id in self._rule_ids:
+            raise ValueError(f"Rule ID {rule.rule_id} is already in use.")
+        if isinstance(rule.source, str) and rule.source not in _UNIT_ATTRIBUTES:
+            raise ValueError(f"Unit has no attribute {rule.source}.")
+        self._rule_ids.add(rule.rule_id)
+        self._rules.setdefault(rule.source, []).append(rule)
+        for values in self._values.values():
+            values.pop(rule.source, None)
+
+    def remove_rule(self, rule: AlertRule) -> None:
+        """Remove a rule and forget its state."""
+        if rule not in self._rules.get(rule.source, ()):
+            raise ValueError(f"Rule {rule.rule_id} was not added.")
+        self._rules[rule.source].remove(rule)
+        if not self._rules[rule.source]:
+            del self._rules[rule.source]
+        self._rule_ids.discard(rule.rule_id)
+        for key in [key for key in self._states if key[1] == rule.rule_id]:
+            del self._states[key]
+            self._pending.pop(key, None)
+
+    def remove_unit(self, serial_number: str) -> None:
+        """Forget the readings and alert states of a unit."""
+        self._values.pop(serial_number, None)
+        for key in [key for key in self._states if key[0] == serial_number]:
+            del self._states[key]
+            self._pending.pop(key, None)
+
+    def active_alerts(self) -> list[tuple[str, str]]:
+        """Return the serial number and rule ID of all active alerts."""
+        return [key for key, state in self._states.items() if state.active]
+
+    def update(
+        self, units: Iterable[Unit | UnitNeverConnected], now: float | None = None
+    ) -> list[AlertTransition]:
+        """Update the unit readings and return the alert transitions.
+
+        Only rules with a changed source value or a pending debounce are
+        evaluated.
+        """
+        if now is None:
+            now = time.monotonic()
+        transitions: list[AlertTransition] = []
+        evaluated: set[tuple[str, str]] = set()
+        # Read all units first, so a unit that fails to read changes no state.
+        unit_values = [(unit.serial_number, self._unit_values(unit)) for unit in units]
+        for serial_number, values in unit_values:
+            previous = self._values.get(serial_number, {})
+            for source, value in values.items():
+                if source in previous and previous[source] == value:
+                    continue
+                for rule in self._rules[source]:
+                    evaluated.add((serial_number, rule.rule_id))
+                    self._evaluate(serial_number, rule, value, now, transitions)
+            self._values[serial_number] = values
+        for key, (rule, value) in list(self._pending.items()):
+            if key not in evaluated:
+                self._evaluate(key[0], rule, value, now, transitions)
+        return transitions
+
+    def _unit_values(
+        self, unit: Unit | UnitNeverConnected
+    ) -> dict[AlertSource, AlertValue]:
+        """Return the values of all rule sources of a unit."""
+        values: dict[AlertSource, AlertValue] = {}
+        if isinstance(unit, Unit):
+            for status_value in (
+                *unit.status_values.primary,
+                *unit.status_values.secondary,
+            ):
+                if status_value.type in self._rules and status_value.type not in values:
+                    values[status_value.type] = _status_value(status_value.center)
+            for consumable in unit.consumables:
+                if consumable.type in self._rules:
+                    values[consumable.type] = _consumable_warning(consumable)
+        for source in self._rules:
+            if isinstance(source, str):
+                try:
+                    values[source] = getattr(unit, source, None)
+                except ValueError:
+                    values[source] = None
+            elif source not in values:
+                values[source] = None
+        return values
+
+    def _evaluate(
+        self,
+        serial_number: str,
+        rule: AlertRule,
+        value: AlertValue,
+        now: float,
+        transitions: list[AlertTransition],
+    ) -> None:
+        """Evaluate a rule for a unit value and add the transition, if any."""
+        key = (serial_number, rule.rule_id)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _AlertState()
+        if rule.is_active(value, state.active) == state.active:
+            state.pending_since = None
+            self._pending.pop(key, None)
+            return
+        if state.pending_since is None:
+            state.pending_since = now
+        if now - state.pending_since < rule.debounce:
+            self._pending[key] = (rule, value)
+            return
+        state.active = not state.active
+        state.pending_since = None
+        self._pending.pop(key, None)
+        transitions.append(
+            AlertTransition(rule, serial_number, state.active, value, now)
+        )
+
+
+def _status_value(center: object) -> AlertValue:
+    """Return the value of a status value center, as float or bool when possible."""
+    if not isinstance(center, StringValue) or center.value == "---":
+        return None
+    if center.value in ("YES", "ON"):
+        return True
+    if center.value in ("NO", "OFF"):
+        return False
+    try:
+        return float(center.value)
+    except ValueError:
+        return center.value
+
+
+def _consumable_warning(
+    consumable: LiquidConsumable | ElectrolyzerConsumable,
+) -> bool:
+    """Return if any part of the consumable has a warning."""
+    if isinstance(consumable, LiquidConsumable):
+        return consumable.canister.has_warning or consumable.tube.has_warning
+    return consumable.electrode.has_warning
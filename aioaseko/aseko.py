@@ -17,17 +17,18 @@
 
 """aioAseko Aseko API."""
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
 from typing import Any, cast
 
-from aiohttp import ClientSession
+from aiohttp import BasicAuth, ClientSession
 from apischema import deserialize
 from gql import Client
 from gql.dsl import DSLInlineFragment, DSLQuery, DSLSchema, dsl_gql, to_camel_case
 from gql.transport.aiohttp import AIOHTTPTransport, log as gql_log
 from gql.transport.exceptions import TransportQueryError
-from yarl import URL
 
 from .exceptions import AsekoAPIError, AsekoInvalidCredentials, AsekoNotLoggedIn
 from .unit import Unit, UnitNeverConnected
@@ -39,20 +40,59 @@ GRAPHQL_URL = "https://graphql.acs.prod.aseko.cloud/graphql"
 gql_log.setLevel(logging.ERROR)
 
 
+def _user_from_data(data: dict[str, Any]) -> User:
+    """Return a user from the raw Aseko API user data."""
+    return User(
+        data["id"],
+        datetime.fromisoformat(data["createdAt"]),
+        datetime.fromisoformat(data["updatedAt"]),
+        data["name"],
+        data["surname"],
+        data["lang"],
+        data["isActive"],
+    )
+
+
 class Aseko:
     """Aseko API."""
 
-    def __init__(self, email: str, password: str) -> None:
-        """Initialize the Aseko API."""
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        gateway_url: str | None = None,
+        session: ClientSession | None = None,
+    ) -> None:
+        """Initialize the Aseko API.
+
+        When a gateway URL is given, requests are sent to an AsekoGateway
+        instead of the Aseko cloud. When a session is given, its connections
+        are reused for all requests, the caller is responsible for closing it.
+        """
         self._email = email
         self._password = password
+        self._gateway_url = gateway_url
+        self._session = session
         self._token: str | None = None
         self._refresh_token: str | None = None
         self._cached_schema: DSLSchema | None = None
+        self._gateway_logged_in = False
 
     async def login(self) -> User:
         """Login to the Aseko API."""
-        async with ClientSession() as session:
+        if self._gateway_url is not None:
+            data = await self._gateway_request("login")
+            self._gateway_logged_in = True
+            return _user_from_data(data["user"])
+        data = await self.login_data()
+        return _user_from_data(data["user"])
+
+    async def login_data(self) -> dict[str, Any]:
+        """Login to the Aseko API and return the raw login data.
+
+        Always logs in to the Aseko cloud, also when a gateway URL is given.
+        """
+        async with self._client_session() as session:
             resp = await session.post(
                 AUTH_URL + "/login",
                 json={
@@ -61,46 +101,71 @@ class Aseko:
                     "cloud": "01HXS50KTV7NRSVNHD617J4CKB",
                 },
             )
-        if resp.status == 401:
-            raise AsekoInvalidCredentials
-        try:
-            resp.raise_for_status()
-        except Exception as e:
-            raise AsekoAPIError from e
-        data = await resp.json()
+            if resp.status == 401:
+                raise AsekoInvalidCredentials
+            try:
+                resp.raise_for_status()
+            except Exception as e:
+                raise AsekoAPIError from e
+            data = await resp.json()
         self._token = data["token"]
         self._refresh_token = resp.cookies["refreshToken"].value
-        return User(
-            data["user"]["id"],
-            datetime.fromisoformat(data["user"]["createdAt"]),
-            datetime.fromisoformat(data["user"]["updatedAt"]),
-            data["user"]["name"],
-            data["user"]["surname"],
-            data["user"]["lang"],
-            data["user"]["isActive"],
-        )
+        return cast(dict[str, Any], data)
+
+    async def _gateway_request(self, path: str) -> Any:
+        """Send a request to the Aseko gateway."""
+        assert self._gateway_url is not None
+        async with self._client_session() as session:
+            resp = await session.post(
+                f"{self._gateway_url.rstrip('/')}/{path}",
+                auth=BasicAuth(self._email, self._password),
+            )
+            if resp.status == 401:
+                raise AsekoInvalidCredentials
+            try:
+                resp.raise_for_status()
+            except Exception as e:
+                raise AsekoAPIError from e
+            return await resp.json()
 
     async def _token_refresh(self) -> None:
         """Refresh the token."""
         assert self._refresh_token is not None
-        async with ClientSession() as session:
-            session.cookie_jar.update_cookies(
-                {"refreshToken": self._refresh_token}, URL(AUTH_URL)
+        async with self._client_session() as session:
+            resp = await session.post(
+                AUTH_URL + "/refresh-token",
+                cookies={"refreshToken": self._refresh_token},
             )
-            resp = await session.post(AUTH_URL + "/refresh-token")
-        try:
-            resp.raise_for_status()
-        except Exception as e:
-            raise AsekoAPIError from e
-        data = await resp.json()
+            try:
+                resp.raise_for_status()
+            except Exception as e:
+                raise AsekoAPIError from e
+            data = await resp.json()
         self._token = data["token"]
 
+    @asynccontextmanager
+    async def _client_session(self) -> AsyncIterator[ClientSession]:
+        """Return the given client session, or a new one for a single request."""
+        if self._session is not None:
+            yield self._session
+            return
+        async with ClientSession() as session:
+            yield session
+
     def _client(self) -> Client:
         """Return the Aseko GraphQL client."""
         if self._token is None:
             raise AsekoNotLoggedIn
+        client_session_args = None
+        if self._session is not None:
+            client_session_args = {
+                "connector": self._session.connector,
+                "connector_owner": False,
+            }
         transport = AIOHTTPTransport(
-            url=GRAPHQL_URL, headers={"Authorization": f"Bearer {self._token}"}
+            url=GRAPHQL_URL,
+            headers={"Authorization": f"Bearer {self._token}"},
+            client_session_args=client_session_args,
         )
         return Client(transport=transport, fetch_schema_from_transport=True)
 
@@ -133,6 +198,24 @@ class Aseko:
                 return deserialize(Unit, data, aliaser=to_camel_case)
             return deserialize(UnitNeverConnected, data, aliaser=to_camel_case)
 
+        if self._gateway_url is not None:
+            if not self._gateway_logged_in:
+                raise AsekoNotLoggedIn
+            data = await self._gateway_request("units")
+        else:
+            data = await self.get_all_units_data()
+        return deserialize(
+            list[Unit | UnitNeverConnected],
+            data,
+            aliaser=to_camel_case,
+            conversion=unit_deserializer,
+        )
+
+    async def get_all_units_data(self) -> list[dict[str, Any]]:
+        """Get the raw data of all units, including never connected units.
+
+        Always queries the Aseko cloud, also when a gateway URL is given.
+        """
         ds = await self._schema()
         query = DSLQuery(
             ds.Query.units.select(
@@ -234,12 +317,7 @@ class Aseko:
             )
         )
         result = await self._query(query)
-        return deserialize(
-            list[Unit | UnitNeverConnected],
-            result["units"]["units"],
-            aliaser=to_camel_case,
-            conversion=unit_deserializer,
-        )
+        return cast(list[dict[str, Any]], result["units"]["units"])
 
     async def get_units(self) -> list[Unit]:
         """Get active units."""
@@ -0,0 +1,197 @@
+# Copyright 2021, 2022, 2024 Milan Meulemans.
+#
+# This file is part of aioaseko.
+#
+# aioaseko is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# aioaseko is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with aioaseko.  If not, see <https://www.gnu.org/licenses/>.
+
+"""aioAseko gateway.
+
+A local caching gateway that shares Aseko sessions between clients.
+Run it with `python -m aioaseko.gateway`, clients connect to it with
+`Aseko(email, password, gateway_url=...)`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import hashlib
+import time
+from typing import Any
+
+from aiohttp import BasicAuth, ClientError, hdrs, web
+from gql.transport.exceptions import TransportError
+
+from .aseko import Aseko
+from .exceptions import AsekoAPIError, AsekoInvalidCredentials
+
+UPSTREAM_ERRORS = (AsekoAPIError, ClientError, TransportError, asyncio.TimeoutError)
+
+
+@dataclass
+class _GatewaySession:
+    """Upstream Aseko session shared by all clients with the same credentials."""
+
+    api: Aseko
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    user: dict[str, Any] | None = None
+    login_updated: float = 0.0
+    units: list[dict[str, Any]] | None = None
+    units_updated: float = 0.0
+
+
+class AsekoGateway:
+    """Aseko gateway server."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        cache_ttl: float = 60.0,
+        login_ttl: float = 3600.0,
+        upstream_timeout: float = 30.0,
+    ) -> None:
+        """Initialize the Aseko gateway.
+
+        Credentials are checked upstream again after `login_ttl` seconds.
+        Upstream calls that take longer than `upstream_timeout` seconds fail.
+        """
+        self._host = host
+        self._port = port
+        self._cache_ttl = cache_ttl
+        self._login_ttl = login_ttl
+        self._upstream_timeout = upstream_timeout
+        self._sessions: dict[tuple[str, bytes], _GatewaySession] = {}
+        self._runner: web.AppRunner | None = None
+        self.app = web.Application()
+        self.app.router.add_post("/login", self._handle_login)
+        self.app.router.add_post("/units", self._handle_units)
+
+    async def start(self) -> None:
+        """Start the gateway server."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+
+    async def stop(self) -> None:
+        """Stop the gateway server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _session(self, request: web.Request) -> _GatewaySession:
+        """Return the logged in upstream session for the request credentials."""
+        try:
+            auth = BasicAuth.decode(request.headers[hdrs.AUTHORIZATION])
+        except (KeyError, ValueError) as e:
+            raise web.HTTPUnauthorized from e
+        key = (auth.login, hashlib.sha256(auth.password.encode()).digest())
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = _GatewaySession(
+                Aseko(auth.login, auth.password)
+            )
+        if self._logged_in(session):
+            return session
+        async with session.lock:
+            if not self._logged_in(session):
+                try:
+                    data = await asyncio.wait_for(
+                        session.api.login_data(), self._upstream_timeout
+                    )
+                except AsekoInvalidCredentials as e:
+                    self._drop_session(key, session)
+                    raise web.HTTPUnauthorized from e
+                except UPSTREAM_ERRORS as e:
+                    self._drop_session(key, session)
+                    raise web.HTTPBadGateway from e
+                session.user = data["user"]
+                session.login_updated = time.monotonic()
+        return session
+
+    def _logged_in(self, session: _GatewaySession) -> bool:
+        """Return if the session has a login that has not expired."""
+        return (
+            session.user is not None
+            and time.monotonic() - session.login_updated <= self._login_ttl
+        )
+
+    def _drop_session(
+        self, key: tuple[str, bytes], session: _GatewaySession
+    ) -> None:
+        """Forget a session that could not log in."""
+        session.user = None
+        if self._sessions.get(key) is session:
+            del self._sessions[key]
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        """Handle a login request."""
+        session = await self._session(request)
+        return web.json_response({"user": session.user})
+
+    async def _handle_units(self, request: web.Request) -> web.Response:
+        """Handle a units request, served from cache when possible."""
+        session = await self._session(request)
+        async with session.lock:
+            if (
+                session.units is None
+                or time.monotonic() - session.units_updated > self._cache_ttl
+            ):
+                try:
+                    session.units = await asyncio.wait_for(
+                        session.api.get_all_units_data(), self._upstream_timeout
+                    )
+                except UPSTREAM_ERRORS as e:
+                    # Login again on the next request, the token may be expired.
+                    session.user = None
+                    raise web.HTTPBadGateway from e
+                session.units_updated = time.monotonic()
+            units = session.units
+        return web.json_response(units)
+
+
+def main() -> None:
+    """Run the Aseko gateway until interrupted."""
+    parser = argparse.ArgumentParser(description="Run the Aseko gateway.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=60.0,
+        help="seconds to cache the unit data",
+    )
+    parser.add_argument(
+        "--login-ttl",
+        type=float,
+        default=3600.0,
+        help="seconds before credentials are checked upstream again",
+    )
+    parser.add_argument(
+        "--upstream-timeout",
+        type=float,
+        default=30.0,
+        help="seconds before an upstream call fails",
+    )
+    args = parser.parse_args()
+    gateway = AsekoGateway(
+        args.host, args.port, args.cache_ttl, args.login_ttl, args.upstream_timeout
+    )
+    web.run_app(gateway.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# Copyright 2021, 2022, 2024 Milan Meulemans.
+#
+# This file is part of aioaseko.
+#
+# aioaseko is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# aioaseko is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with aioaseko.  If not, see <https://www.gnu.org/licenses/>.
+
+"""aioAseko synchronous API."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+import os
+import threading
+from typing import Any
+from weakref import WeakSet
+
+from aiohttp import ClientSession
+
+from .aseko import Aseko
+from .unit import Unit, UnitNeverConnected
+from .user import User
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_loop_lock = threading.Lock()
+_instances: WeakSet[AsekoSync] = WeakSet()
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop of the background thread, start it if needed."""
+    global _loop, _thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever, name="aioaseko", daemon=True
+            )
+            _thread.start()
+        return _loop
+
+
+def _stop_event_loop() -> None:
+    """Stop the event loop of the background thread, if it is running."""
+    global _loop, _thread
+    with _loop_lock:
+        if _loop is None or _thread is None:
+            return
+        _loop.call_soon_threadsafe(_loop.stop)
+        _thread.join()
+        _loop.close()
+        _loop = None
+        _thread = None
+
+
+def _after_fork_in_child() -> None:
+    """Reset the event loop and instances, the loop thread is not forked."""
+    global _loop, _thread, _loop_lock
+    _loop = None
+    _thread = None
+    _loop_lock = threading.Lock()
+    for instance in _instances:
+        if instance._session is not None:
+            # The session belongs to the parent's loop, it can not be closed here.
+            instance._session.detach()
+        instance._lock = threading.RLock()
+        instance._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class AsekoSync:
+    """Synchronous Aseko API, safe to use from multiple threads.
+
+    All calls run on one shared background event loop with a persistent
+    client session, so connections, the token and the schema are kept
+    between calls. Concurrent calls of the same method share a single
+    request. After a fork, the child logs in again when the parent had
+    logged in.
+    """
+
+    def __init__(
+        self, email: str, password: str, gateway_url: str | None = None
+    ) -> None:
+        """Initialize the synchronous Aseko API."""
+        self._email = email
+        self._password = password
+        self._gateway_url = gateway_url
+        self._api: Aseko | None = None
+        self._session: ClientSession | None = None
+        self._logged_in = False
+        self._lock = threading.RLock()
+        self._pending: dict[str, Future[Any]] = {}
+        _instances.add(self)
+
+    def login(self, timeout: float | None = None) -> User:
+        """Login to the Aseko API."""
+        user: User = self._call("login", timeout)
+        return user
+
+    def get_all_units(
+        self, timeout: float | None = None
+    ) -> list[Unit | UnitNeverConnected]:
+        """Get all units, including never connected units."""
+        return list(self._call("get_all_units", timeout))
+
+    def get_units(self, timeout: float | None = None) -> list[Unit]:
+        """Get active units."""
+        return list(self._call("get_units", timeout))
+
+    def close(self) -> None:
+        """Close the client session, stop the event loop when no client is left."""
+        if threading.current_thread() is _thread:
+            raise RuntimeError("AsekoSync can not be closed from its event loop.")
+        with _loop_lock:
+            loop = _loop
+        if loop is not None and self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+        self._reset()
+        _instances.discard(self)
+        if not _instances:
+            _stop_event_loop()
+
+    def _call(self, name: str, timeout: float | None) -> Any:
+        """Run a method on the event loop, or join the pending call of it."""
+        if threading.current_thread() is _thread:
+            raise RuntimeError("AsekoSync can not be called from its event loop.")
+        with self._lock:
+            future = self._pending.get(name)
+            if future is None:
+                future = asyncio.run_coroutine_threadsafe(
+                    self._run(name), _event_loop()
+                )
+                self._pending[name] = future
+                future.add_done_callback(lambda done: self._done(name, done))
+        return future.result(timeout)
+
+    async def _run(self, name: str) -> Any:
+        """Run a method of the Aseko API, create the API if needed."""
+        if self._api is None:
+            _instances.add(self)
+            self._session = ClientSession()
+            self._api = Aseko(
+                self._email, self._password, self._gateway_url, self._session
+            )
+            if self._logged_in and name != "login":
+                await self._api.login()
+        result = await getattr(self._api, name)()
+        if name == "login":
+            self._logged_in = True
+        return result
+
+    def _done(self, name: str, future: Future[Any]) -> None:
+        """Remove a finished call from the pending calls."""
+        with self._lock:
+            if self._pending.get(name) is future:
+                del self._pending[name]
+
+    def _reset(self) -> None:
+        """Forget the API, its session and the pending calls."""
+        self._api = None
+        self._session = None
+        self._pending.clear()
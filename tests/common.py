@@ -0,0 +1,62 @@
+"""Common data for aioaseko tests."""
+
+from __future__ import annotations
+
+from aioaseko import StatusValue, StatusValues, StatusValueType, StringValue, Unit
+
+USER_DATA = {
+    "id": "user-1",
+    "createdAt": "2024-01-01T00:00:00+00:00",
+    "updatedAt": "2024-01-02T00:00:00+00:00",
+    "name": "Aseko",
+    "surname": "User",
+    "lang": "en",
+    "isActive": True,
+}
+
+UNIT_DATA = {
+    "serialNumber": "110123456",
+    "name": "Pool",
+    "note": None,
+    "online": True,
+    "hasWarning": False,
+    "timeZone": "Europe/Brussels",
+    "position": 0,
+    "brandName": {"primary": "ASIN AQUA", "secondary": "Home"},
+    "consumables": [],
+    "statusValues": {
+        "primary": [{"type": "PH", "center": {"value": "7.2"}}],
+        "secondary": [{"type": "HEATING", "center": {"value": "OFF"}}],
+    },
+}
+
+UNIT_NEVER_CONNECTED_DATA = {
+    "serialNumber": "110654321",
+    "name": None,
+    "note": None,
+    "position": 1,
+    "online": False,
+}
+
+
+def make_unit(serial_number: str = "1", online: bool = True, **values: str) -> Unit:
+    """Return a unit with the given status values, by status value type name."""
+    return Unit(
+        serial_number,
+        None,
+        None,
+        online,
+        False,
+        "Europe/Brussels",
+        0,
+        None,
+        [],
+        StatusValues(
+            [
+                StatusValue(StatusValueType[name.upper()], StringValue(value))
+                for name, value in values.items()
+            ],
+            [],
+        ),
+    )
+
@@ -0,0 +1,165 @@
+"""Tests for the alert rule engine."""
+
+from __future__ import annotations
+
+import pytest
+
+from aioaseko import (
+    AlertEngine,
+    AlertRule,
+    ConsumableType,
+    StatusValueType,
+    UnitNeverConnected,
+)
+
+from .common import make_unit
+
+
+def changes(transitions: list) -> list[tuple[str, str, bool]]:
+    """Return the serial number, rule ID and state of transitions."""
+    return [(t.serial_number, t.rule.rule_id, t.active) for t in transitions]
+
+
+def test_threshold() -> None:
+    """Test a threshold rule activates and clears."""
+    engine = AlertEngine([AlertRule("ph", StatusValueType.PH, low=7.0, high=7.6)])
+    assert changes(engine.update([make_unit(ph="7.2")], 0)) == []
+    assert changes(engine.update([make_unit(ph="7.8")], 1)) == [("1", "ph", True)]
+    assert engine.active_alerts() == [("1", "ph")]
+    assert changes(engine.update([make_unit(ph="7.4")], 2)) == [("1", "ph", False)]
+
+
+def test_hysteresis() -> None:
+    """Test an active rule only clears inside the hysteresis."""
+    engine = AlertEngine(
+        [AlertRule("ph", StatusValueType.PH, high=7.6, hysteresis=0.1)]
+    )
+    engine.update([make_unit(ph="7.7")], 0)
+    assert changes(engine.update([make_unit(ph="7.55")], 1)) == []
+    assert changes(engine.update([make_unit(ph="7.45")], 2)) == [("1", "ph", False)]
+
+
+def test_debounce() -> None:
+    """Test a state change is only emitted after the debounce."""
+    engine = AlertEngine([AlertRule("ph", StatusValueType.PH, high=7.6, debounce=10)])
+    assert changes(engine.update([make_unit(ph="7.8")], 0)) == []
+    assert changes(engine.update([make_unit(ph="7.8")], 5)) == []
+    assert changes(engine.update([make_unit(ph="7.8")], 10)) == [("1", "ph", True)]
+
+
+def test_debounce_interrupted() -> None:
+    """Test a state change that does not hold is not emitted."""
+    engine = AlertEngine([AlertRule("ph", StatusValueType.PH, high=7.6, debounce=10)])
+    engine.update([make_unit(ph="7.8")], 0)
+    engine.update([make_unit(ph="7.2")], 5)
+    assert changes(engine.update([make_unit(ph="7.8")], 11)) == []
+    assert changes(engine.update([make_unit(ph="7.8")], 21)) == [("1", "ph", True)]
+
+
+def test_unknown_value_clears() -> None:
+    """Test an active rule clears when its value becomes unknown."""
+    engine = AlertEngine([AlertRule("ph", StatusValueType.PH, high=7.6)])
+    engine.update([make_unit(ph="7.9")], 0)
+    transitions = engine.update([make_unit(ph="---")], 1)
+    assert changes(transitions) == [("1", "ph", False)]
+    assert transitions[0].value is None
+    engine.update([make_unit(ph="7.9")], 2)
+    assert changes(
+        engine.update([UnitNeverConnected("1", None, None, 0, False)], 3)
+    ) == [("1", "ph", False)]
+
+
+def test_unit_attributes() -> None:
+    """Test rules on unit attributes, including int and bool values."""
+    engine = AlertEngine(
+        [
+            AlertRule("redox", "redox", low=650),
+            AlertRule("heating", "heating", equals=True),
+            AlertRule("offline", "online", equals=False),
+        ]
+    )
+    transitions = engine.update(
+        [make_unit(online=False, redox="600", heating="OFF")], 0
+    )
+    assert sorted(changes(transitions)) == [
+        ("1", "offline", True),
+        ("1", "redox", True),
+    ]
+    assert changes(engine.update([make_unit(redox="700", heating="ON")], 1)) == [
+        ("1", "redox", False),
+        ("1", "heating", True),
+        ("1", "offline", False),
+    ]
+
+
+def test_boolean_status_value() -> None:
+    """Test rules on boolean status values."""
+    engine = AlertEngine(
+        [AlertRule("flow", StatusValueType.WATER_FLOW_TO_PROBES, equals=False)]
+    )
+    transitions = engine.update([make_unit(water_flow_to_probes="NO")], 0)
+    assert changes(transitions) == [("1", "flow", True)]
+
+
+def test_unconvertible_value() -> None:
+    """Test a value that fails to convert is unknown and changes no other unit."""
+    engine = AlertEngine([AlertRule("redox", "redox", low=650)])
+    transitions = engine.update(
+        [make_unit("a", redox="500"), make_unit("b", redox="650.5")], 0
+    )
+    assert changes(transitions) == [("a", "redox", True)]
+
+
+def test_only_changed_sources_evaluated() -> None:
+    """Test unchanged values emit nothing."""
+    engine = AlertEngine(
+        [
+            AlertRule("ph", StatusValueType.PH, high=7.6),
+            AlertRule("cl", ConsumableType.CL, equals=True),
+        ]
+    )
+    units = [make_unit(str(index), ph="7.8") for index in range(100)]
+    assert len(engine.update(units, 0)) == 100
+    assert engine.update(units, 1) == []
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"equals": True, "low": 1},
+        {"low": 8, "high": 7},
+        {"low": 1, "hysteresis": -1},
+        {"low": 1, "debounce": -1},
+    ],
+)
+def test_invalid_rule(kwargs: dict) -> None:
+    """Test invalid rules are rejected."""
+    with pytest.raises(ValueError):
+        AlertRule("rule", StatusValueType.PH, **kwargs)
+
+
+def test_add_and_remove_rule() -> None:
+    """Test adding and removing rules."""
+    rule = AlertRule("ph", StatusValueType.PH, high=7.6)
+    engine = AlertEngine([rule])
+    with pytest.raises(ValueError):
+        engine.add_rule(AlertRule("ph", "online", equals=False))
+    with pytest.raises(ValueError):
+        engine.add_rule(AlertRule("typo", "onlin", equals=False))
+    engine.update([make_unit(ph="7.8")], 0)
+    engine.remove_rule(rule)
+    assert engine.active_alerts() == []
+    with pytest.raises(ValueError):
+        engine.remove_rule(rule)
+
+
+def test_remove_unit() -> None:
+    """Test a removed unit is forgotten."""
+    engine = AlertEngine([AlertRule("ph", StatusValueType.PH, high=7.6)])
+    engine.update([make_unit("a", ph="7.8"), make_unit("b", ph="7.8")], 0)
+    engine.remove_unit("a")
+    assert engine.active_alerts() == [("b", "ph")]
+    assert changes(engine.update([make_unit("a", ph="7.8")], 1)) == [
+        ("a", "ph", True)
+    ]
@@ -0,0 +1,184 @@
+"""Tests for the Aseko gateway."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from aiohttp import ClientConnectionError
+from aiohttp.test_utils import TestServer
+import pytest
+
+from aioaseko import (
+    Aseko,
+    AsekoAPIError,
+    AsekoInvalidCredentials,
+    AsekoNotLoggedIn,
+    Unit,
+    UnitNeverConnected,
+)
+from aioaseko.gateway import AsekoGateway
+
+from .common import UNIT_DATA, UNIT_NEVER_CONNECTED_DATA, USER_DATA
+
+
+class FakeUpstream:
+    """Fake Aseko cloud, patched into the Aseko raw data methods."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Initialize the fake upstream."""
+        self.logins = 0
+        self.units_calls = 0
+        self.login_error: Exception | None = None
+        self.units_error: Exception | None = None
+        self.units_delay = 0.0
+        upstream = self
+
+        async def login_data(api: Aseko) -> dict[str, Any]:
+            upstream.logins += 1
+            if upstream.login_error is not None:
+                raise upstream.login_error
+            return {"token": "token", "user": USER_DATA}
+
+        async def get_all_units_data(api: Aseko) -> list[dict[str, Any]]:
+            upstream.units_calls += 1
+            await asyncio.sleep(upstream.units_delay)
+            if upstream.units_error is not None:
+                raise upstream.units_error
+            return [UNIT_DATA, UNIT_NEVER_CONNECTED_DATA]
+
+        monkeypatch.setattr(Aseko, "login_data", login_data)
+        monkeypatch.setattr(Aseko, "get_all_units_data", get_all_units_data)
+
+
+@pytest.fixture
+def upstream(monkeypatch: pytest.MonkeyPatch) -> FakeUpstream:
+    """Return the fake upstream."""
+    return FakeUpstream(monkeypatch)
+
+
+async def start_gateway(**kwargs: Any) -> tuple[AsekoGateway, TestServer]:
+    """Start a gateway on a test server."""
+    gateway = AsekoGateway(**kwargs)
+    server = TestServer(gateway.app)
+    await server.start_server()
+    return gateway, server
+
+
+@pytest.fixture
+async def gateway(upstream: FakeUpstream) -> AsyncIterator[TestServer]:
+    """Return a running gateway test server."""
+    _, server = await start_gateway()
+    yield server
+    await server.close()
+
+
+def client(server: TestServer, password: str = "passw0rd") -> Aseko:
+    """Return an Aseko client for the gateway."""
+    return Aseko("aioAseko@example.com", password, str(server.make_url("")))
+
+
+async def test_login_and_units(upstream: FakeUpstream, gateway: TestServer) -> None:
+    """Test a login and the unit data through the gateway."""
+    api = client(gateway)
+    user = await api.login()
+    assert user.user_id == "user-1"
+    units = await api.get_all_units()
+    assert isinstance(units[0], Unit)
+    assert units[0].ph == 7.2
+    assert units[0].heating is False
+    assert isinstance(units[1], UnitNeverConnected)
+    assert [unit.serial_number for unit in await api.get_units()] == ["110123456"]
+
+
+async def test_units_require_login(gateway: TestServer) -> None:
+    """Test units can not be requested before login."""
+    with pytest.raises(AsekoNotLoggedIn):
+        await client(gateway).get_all_units()
+
+
+async def test_upstream_calls_shared(
+    upstream: FakeUpstream, gateway: TestServer
+) -> None:
+    """Test clients with the same credentials share logins and cached units."""
+    upstream.units_delay = 0.05
+    apis = [client(gateway) for _ in range(5)]
+    await asyncio.gather(*(api.login() for api in apis))
+    await asyncio.gather(*(api.get_all_units() for api in apis))
+    await apis[0].get_all_units()
+    assert upstream.logins == 1
+    assert upstream.units_calls == 1
+
+
+async def test_cache_ttl(upstream: FakeUpstream) -> None:
+    """Test the unit data is fetched again after the cache TTL."""
+    _, server = await start_gateway(cache_ttl=0.0)
+    api = client(server)
+    await api.login()
+    await api.get_all_units()
+    await asyncio.sleep(0.01)
+    await api.get_all_units()
+    await server.close()
+    assert upstream.units_calls == 2
+
+
+async def test_login_ttl(upstream: FakeUpstream) -> None:
+    """Test the credentials are checked upstream again after the login TTL."""
+    _, server = await start_gateway(login_ttl=0.0)
+    api = client(server)
+    await api.login()
+    await asyncio.sleep(0.01)
+    upstream.login_error = AsekoInvalidCredentials()
+    with pytest.raises(AsekoInvalidCredentials):
+        await api.get_all_units()
+    await server.close()
+    assert upstream.logins == 2
+
+
+async def test_invalid_credentials(upstream: FakeUpstream) -> None:
+    """Test invalid upstream credentials are returned as 401."""
+    gateway, server = await start_gateway()
+    upstream.login_error = AsekoInvalidCredentials()
+    with pytest.raises(AsekoInvalidCredentials):
+        await client(server, "wrong").login()
+    await server.close()
+    assert not gateway._sessions
+
+
+@pytest.mark.parametrize(
+    "error", [AsekoAPIError(), ClientConnectionError(), asyncio.TimeoutError()]
+)
+async def test_login_upstream_error(upstream: FakeUpstream, error: Exception) -> None:
+    """Test upstream login errors are returned as 502 and forget the session."""
+    gateway, server = await start_gateway()
+    upstream.login_error = error
+    with pytest.raises(AsekoAPIError):
+        await client(server).login()
+    await server.close()
+    assert not gateway._sessions
+
+
+async def test_units_upstream_error(upstream: FakeUpstream) -> None:
+    """Test upstream unit errors are returned as 502 and drop the login."""
+    _, server = await start_gateway(cache_ttl=0.0)
+    api = client(server)
+    await api.login()
+    upstream.units_error = ClientConnectionError()
+    with pytest.raises(AsekoAPIError):
+        await api.get_all_units()
+    upstream.units_error = None
+    await api.get_all_units()
+    await server.close()
+    assert upstream.logins == 2
+
+
+async def test_upstream_timeout(upstream: FakeUpstream) -> None:
+    """Test a stuck upstream call times out as 502."""
+    _, server = await start_gateway(upstream_timeout=0.05)
+    api = client(server)
+    await api.login()
+    upstream.units_delay = 1.0
+    with pytest.raises(AsekoAPIError):
+        await api.get_all_units()
+    await server.close()
@@ -0,0 +1,99 @@
+"""Tests for the synchronous Aseko API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from datetime import datetime
+import threading
+
+import pytest
+
+from aioaseko import Aseko, AsekoSync, User
+import aioaseko.sync
+
+from .common import make_unit
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    """Patch the Aseko API and return its call counts."""
+    calls = {"login": 0, "get_units": 0}
+
+    async def login(api: Aseko) -> User:
+        calls["login"] += 1
+        created = datetime(2024, 1, 1)
+        return User("user-1", created, created, "Aseko", "User", "en", True)
+
+    async def get_units(api: Aseko) -> list:
+        calls["get_units"] += 1
+        assert api._session is not None and not api._session.closed
+        await asyncio.sleep(0.1)
+        return [make_unit()]
+
+    monkeypatch.setattr(Aseko, "login", login)
+    monkeypatch.setattr(Aseko, "get_units", get_units)
+    return calls
+
+
+@pytest.fixture
+def api(calls: dict[str, int]) -> Iterator[AsekoSync]:
+    """Return a synchronous API."""
+    api = AsekoSync("aioAseko@example.com", "passw0rd")
+    yield api
+    api.close()
+
+
+def test_login_and_units(api: AsekoSync, calls: dict[str, int]) -> None:
+    """Test calls return the results of the Aseko API."""
+    assert api.login().user_id == "user-1"
+    assert api.get_units()[0].serial_number == "1"
+    assert calls == {"login": 1, "get_units": 1}
+
+
+def test_coalescing(api: AsekoSync, calls: dict[str, int]) -> None:
+    """Test concurrent calls share one request but not the result list."""
+    results: list[list] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(api.get_units()))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls["get_units"] == 1
+    assert len(results) == 10
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+
+
+def test_session_reused(api: AsekoSync) -> None:
+    """Test the client session is kept between calls."""
+    api.get_units()
+    session = api._session
+    api.get_units()
+    assert api._session is session
+
+
+def test_call_from_loop(api: AsekoSync) -> None:
+    """Test calling from the event loop thread raises instead of deadlocking."""
+    api.login()
+
+    async def call() -> None:
+        api.get_units()
+
+    loop = aioaseko.sync._event_loop()
+    with pytest.raises(RuntimeError):
+        asyncio.run_coroutine_threadsafe(call(), loop).result(1)
+
+
+def test_close(calls: dict[str, int]) -> None:
+    """Test close closes the session and stops the event loop."""
+    api = AsekoSync("aioAseko@example.com", "passw0rd")
+    api.get_units()
+    session = api._session
+    assert session is not None
+    api.close()
+    assert session.closed
+    assert aioaseko.sync._loop is None